@@ -1,13 +1,25 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./courses.db"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./courses.db"
 
 
-# connect_args only for SQLite
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# Async engine so request handlers can await queries on the event loop
+# instead of tying up a threadpool worker per request.
+# Explicit QueuePool sizing so concurrent requests don't exhaust the default
+# pool; pre_ping drops dead connections before they're handed out.
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=3600,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes usable after commit without
+# a refresh SELECT (which AsyncSession can't issue implicitly anyway). Course
+# rows are never updated by the app, so there's no stale data to worry about.
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
\ No newline at end of file
@@ -1,13 +1,18 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import text, func, select, delete
 from pydantic import BaseModel, EmailStr
 from email.message import EmailMessage
 from dotenv import load_dotenv
-import smtplib
+from pathlib import Path
+import aiosmtplib
+import asyncio
+import hashlib
+import logging
+import string
 import os
 import time
 
@@ -19,6 +24,9 @@ from database import SessionLocal, engine
 # ---------------------------
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger(__name__)
+
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = int(os.getenv("SMTP_PORT") or 587)
 SMTP_USER = os.getenv("SMTP_USER")
@@ -28,22 +36,90 @@ FROM_NAME = os.getenv("FROM_NAME") or "Course Team"
 OWNER_EMAIL = os.getenv("OWNER_EMAIL")
 
 # Log email configuration on startup
-print("="*60)
-print("📧 EMAIL CONFIGURATION:")
-print(f"  SMTP_HOST: {SMTP_HOST}")
-print(f"  SMTP_PORT: {SMTP_PORT}")
-print(f"  SMTP_USER: {SMTP_USER}")
-print(f"  FROM_EMAIL: {FROM_EMAIL}")
-print(f"  OWNER_EMAIL: {OWNER_EMAIL}")
-print("="*60)
+logger.info(
+    "📧 EMAIL CONFIGURATION: SMTP_HOST=%s SMTP_PORT=%s SMTP_USER=%s FROM_EMAIL=%s OWNER_EMAIL=%s",
+    SMTP_HOST, SMTP_PORT, SMTP_USER, FROM_EMAIL, OWNER_EMAIL,
+)
+
+# ---------------------------
+# Shared SMTP Connection
+# ---------------------------
+class SMTPPool:
+    """Keeps one SMTP connection open and reuses it across sends.
+
+    The connection is checked with NOOP before each send and reopened
+    (STARTTLS + login) only when the server has dropped it.
+    """
+
+    def __init__(self, host, port, user, password, timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.conn = None
+        self.lock = asyncio.Lock()
+
+    async def _connect(self):
+        # STARTTLS is issued explicitly below so a server without it still works
+        conn = aiosmtplib.SMTP(hostname=self.host, port=self.port, timeout=self.timeout, start_tls=False)
+        await conn.connect()
+        # If credentials provided, try secure connection and login
+        if self.user:
+            try:
+                await conn.starttls()
+            except Exception as e:
+                # starttls may not be supported; continue anyway
+                logger.warning("STARTTLS warning (continuing): %s", e)
+            try:
+                await conn.login(self.user, self.password)
+            except Exception:
+                conn.close()
+                raise
+        self.conn = conn
+        logger.info("SMTP connection opened to %s:%s", self.host, self.port)
+
+    def _reset(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = None
+
+    async def send(self, msg):
+        async with self.lock:
+            if self.conn is not None:
+                try:
+                    await self.conn.noop()
+                except (aiosmtplib.SMTPException, OSError):
+                    self._reset()
+            if self.conn is None:
+                await self._connect()
+            try:
+                await self.conn.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                # Dropped between NOOP and send; retry once on a fresh connection
+                self._reset()
+                await self._connect()
+                await self.conn.send_message(msg)
+            except Exception:
+                # Don't reuse a connection left in an unknown state
+                self._reset()
+                raise
+
+
+SMTP_POOL = SMTPPool(SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS)
 
 # ---------------------------
 # Course Timings
 # ---------------------------
+# (start, end, date) per course id, unpacked in one lookup
 COURSE_SCHEDULE = {
-    1: {"start": "5:00 PM", "end": "5:30 PM", "date": "December 1, 2025"},
-    2: {"start": "5:45 PM", "end": "6:16 PM", "date": "December 1, 2025"},
+    1: ("5:00 PM", "5:30 PM", "December 1, 2025"),
+    2: ("5:45 PM", "6:16 PM", "December 1, 2025"),
 }
+SCHEDULE_TBA = ("TBA", "TBA", "TBA")
 
 # ---------------------------
 # FastAPI App
@@ -61,26 +137,57 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Health Check Endpoint
 # ---------------------------
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok", "message": "Server is running"}
 
 # ---------------------------
 # Serve index.html at "/"
 # ---------------------------
+# Pages are read once at import and served from memory with an ETag so
+# browsers can revalidate with a 304 instead of re-downloading. A missing
+# file only breaks its own route, not the whole app.
+def load_page(path: str):
+    try:
+        body = Path(path).read_bytes()
+    except FileNotFoundError:
+        logger.error("Page not found: %s", path)
+        return None
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    return body, etag
+
+
+def page_response(request: Request, page):
+    if page is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, etag = page
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="text/html", headers=headers)
+
+
+INDEX_PAGE = load_page("static/index.html")
+COURSE_DETAIL_PAGE = load_page("static/course-detail.html")
+
+
 @app.get("/")
-def home():
-    return FileResponse("static/index.html")
+async def home(request: Request):
+    return page_response(request, INDEX_PAGE)
+
 
+# One handler for the course page, also accepting a few common alternative
+# paths (no-extension or trailing slash)
+async def course_detail_page(request: Request):
+    return page_response(request, COURSE_DETAIL_PAGE)
 
-@app.get("/course-detail.html")
-def course_detail_page():
-    return FileResponse("static/course-detail.html")
 
+for route_path in ("/course-detail.html", "/course-detail", "/course-detail/", "/course-detail.html/"):
+    app.add_api_route(route_path, course_detail_page, methods=["GET"])
 
-# Debug helper: check working directory and file existence for troubleshooting 404s
-@app.get("/debug/check-course-detail")
+
+# Debug helper: check working directory and file existence for troubleshooting 404s.
+# Only registered when DEBUG is set, since it exposes filesystem details.
 def debug_check_course_file():
-    import os
     path = os.path.join("static", "course-detail.html")
     static_files = []
     if os.path.isdir("static"):
@@ -99,20 +206,9 @@ def debug_check_course_file():
     }
 
 
-# Also accept a few common alternative paths (no-extension or trailing slash)
-@app.get("/course-detail")
-def course_detail_no_ext():
-    return FileResponse("static/course-detail.html")
-
+if os.getenv("DEBUG"):
+    app.add_api_route("/debug/check-course-detail", debug_check_course_file, methods=["GET"])
 
-@app.get("/course-detail/")
-def course_detail_trailing():
-    return FileResponse("static/course-detail.html")
-
-
-@app.get("/course-detail.html/")
-def course_detail_html_trailing():
-    return FileResponse("static/course-detail.html")
 
 # ---------------------------
 # CORS
@@ -131,77 +227,120 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     try:
-        models.Base.metadata.create_all(bind=engine)
-        print("✓ Database tables created successfully")
-        init_courses()
+        # create_all doesn't add columns or indexes to tables that already
+        # exist, so bring older databases up to date in the same transaction
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+            cols = {row[1] for row in await conn.execute(text("PRAGMA table_info(bookings)"))}
+            if "email" not in cols:
+                await conn.execute(text("ALTER TABLE bookings ADD COLUMN email VARCHAR"))
+            if "phone" not in cols:
+                await conn.execute(text("ALTER TABLE bookings ADD COLUMN phone VARCHAR"))
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bookings_course_id ON bookings (course_id)"))
+        logger.info("✓ Database tables created successfully")
+        await init_courses()
+        async with SessionLocal() as db:
+            await load_course_cache(db)
     except Exception as e:
-        print(f"⚠ Startup initialization error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("⚠ Startup initialization error: %s", e)
 
-# Initialize courses if they don't exist
-def init_courses():
+# Initialize courses if they don't exist. Existing data is only wiped when
+# RESET_DB=1, so restarts and extra workers don't clear live bookings.
+async def init_courses():
     db = SessionLocal()
     try:
-        # Clear all existing bookings and courses
-        db.query(models.Booking).delete()
-        db.query(models.Course).delete()
-        db.commit()
-        print("Cleared all bookings and courses")
+        if os.getenv("RESET_DB") == "1":
+            # Clear all existing bookings and courses
+            await db.execute(delete(models.Booking))
+            await db.execute(delete(models.Course))
+            await db.commit()
+            logger.info("Cleared all bookings and courses (RESET_DB=1)")
         
         # Create the two courses with 10 seats each
         courses_data = [
             {"id": 1, "name": "Artificial Intelligence (AI)", "description": "Learn ML, DL, Neural Networks, and AI applications.", "total_seats": 10},
             {"id": 2, "name": "Quantum Computing", "description": "Learn Qubits, Quantum Gates, and Algorithms.", "total_seats": 10}
         ]
-        for cdata in courses_data:
+        existing_ids = set((await db.execute(select(models.Course.id))).scalars().all())
+        missing = [cdata for cdata in courses_data if cdata["id"] not in existing_ids]
+        for cdata in missing:
             c = models.Course(id=cdata["id"], name=cdata["name"], description=cdata["description"], total_seats=cdata["total_seats"])
             db.add(c)
-        db.commit()
-        print("Initialized courses with 10 seats each")
+        if missing:
+            await db.commit()
+            logger.info("Initialized %d course(s) with 10 seats each", len(missing))
     except Exception as e:
-        print("Could not initialize courses:", e)
-        db.rollback()
+        logger.error("Could not initialize courses: %s", e)
+        await db.rollback()
     finally:
-        db.close()
+        await db.close()
+
+# Courses are seeded at startup and never modified afterwards, so keep them in
+# memory: {id: (name, description, total_seats)}. Only booked counts need the DB.
+# The cache is also (re)filled on demand, so a failed startup doesn't leave the
+# worker serving an empty course list.
+COURSE_CACHE = {}
+
+
+async def load_course_cache(db: AsyncSession):
+    courses = (await db.execute(select(models.Course))).scalars().all()
+    COURSE_CACHE.clear()
+    COURSE_CACHE.update({c.id: (c.name, c.description, c.total_seats) for c in courses})
+    logger.info("Cached %d course(s)", len(COURSE_CACHE))
+
+
+async def get_cached_course(db: AsyncSession, course_id: int):
+    course = COURSE_CACHE.get(course_id)
+    if course is None:
+        # Not cached yet (or startup never filled the cache): reload and retry
+        await load_course_cache(db)
+        course = COURSE_CACHE.get(course_id)
+    return course
 
 # ---------------------------
 # DB Session Dependency
 # ---------------------------
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # ---------------------------
-# Email Function
+# Email Templates
 # ---------------------------
-def send_confirmation_email(to_email: str, user_name: str, course_name: str, course_id: int):
+# Minified CSS shared by both emails; only the accent colour and a few
+# template-specific rules differ.
+def email_style(accent: str, extra: str = "") -> str:
+    return (
+        "<style>"
+        "body{font-family:Arial,sans-serif;line-height:1.6;color:#333}"
+        ".container{max-width:600px;margin:0 auto;padding:20px;background-color:#f9f9f9;border-radius:8px}"
+        f".header{{background-color:{accent};color:#fff;padding:20px;text-align:center;border-radius:8px 8px 0 0}}"
+        ".content{background-color:#fff;padding:20px}"
+        ".detail-item{margin:10px 0}"
+        ".footer{text-align:center;padding:20px;font-size:12px;color:#666}"
+        f"{extra}"
+        "</style>"
+    )
 
-    schedule = COURSE_SCHEDULE.get(course_id, {})
-    start = schedule.get("start", "TBA")
-    end = schedule.get("end", "TBA")
-    date = schedule.get("date", "TBA")
 
-    subject = f"Booking Confirmed — {course_name}"
-    
-    # HTML email template
-    html_body = f"""
+CONFIRM_STYLE = email_style(
+    "#4CAF50",
+    ".course-name{font-size:24px;font-weight:bold;color:#4CAF50;margin-bottom:10px}"
+    ".course-details{background-color:#f0f0f0;padding:15px;border-left:4px solid #4CAF50;margin:15px 0}"
+    ".button{display:inline-block;background-color:#4CAF50;color:#fff;padding:12px 30px;text-decoration:none;border-radius:5px;margin:20px 0;text-align:center;font-weight:bold}",
+)
+
+OWNER_STYLE = email_style(
+    "#2196F3",
+    ".booking-details{background-color:#f0f0f0;padding:15px;border-left:4px solid #2196F3;margin:15px 0}"
+    ".detail-label{font-weight:bold;color:#2196F3}",
+)
+
+# Compiled once at import; each send only substitutes the booking fields.
+CONFIRM_HTML = string.Template("""
     <html>
       <head>
-        <style>
-          body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-          .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; border-radius: 8px; }}
-          .header {{ background-color: #4CAF50; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-          .content {{ background-color: white; padding: 20px; }}
-          .course-name {{ font-size: 24px; font-weight: bold; color: #4CAF50; margin-bottom: 10px; }}
-          .course-details {{ background-color: #f0f0f0; padding: 15px; border-left: 4px solid #4CAF50; margin: 15px 0; }}
-          .detail-item {{ margin: 10px 0; }}
-          .button {{ display: inline-block; background-color: #4CAF50; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; text-align: center; font-weight: bold; }}
-          .footer {{ text-align: center; padding: 20px; font-size: 12px; color: #666; }}
-        </style>
+        """ + CONFIRM_STYLE + """
       </head>
       <body>
         <div class="container">
@@ -209,14 +348,14 @@ def send_confirmation_email(to_email: str, user_name: str, course_name: str, cou
             <h1>Booking Confirmed!</h1>
           </div>
           <div class="content">
-            <p>Hello <strong>{user_name}</strong>,</p>
+            <p>Hello <strong>${user_name}</strong>,</p>
             <p>Your booking is confirmed for:</p>
             
-            <div class="course-name">{course_name} Course</div>
+            <div class="course-name">${course_name} Course</div>
             
             <div class="course-details">
-              <div class="detail-item"><strong>Date:</strong> {date}</div>
-              <div class="detail-item"><strong>Time:</strong> {start} - {end}</div>
+              <div class="detail-item"><strong>Date:</strong> ${date}</div>
+              <div class="detail-item"><strong>Time:</strong> ${start} - ${end}</div>
             </div>
             
             <p>We're excited to see you in this course! Make sure to mark your calendar and prepare for an amazing learning experience.</p>
@@ -234,108 +373,26 @@ def send_confirmation_email(to_email: str, user_name: str, course_name: str, cou
         </div>
       </body>
     </html>
-    """
-    
-    # Plain text fallback
-    text_body = f"""
-Hello {user_name},
+    """)
 
-Thank you for booking the course: {course_name}.
+CONFIRM_TEXT = string.Template("""
+Hello ${user_name},
+
+Thank you for booking the course: ${course_name}.
 
 Course Details:
-  Date: {date}
-  Time: {start} - {end}
+  Date: ${date}
+  Time: ${start} - ${end}
 
 We look forward to seeing you!
 
 — Course Team
-"""
-
-    msg = EmailMessage()
-    msg["From"] = FROM_EMAIL
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.set_content(text_body)
-    msg.add_alternative(html_body, subtype='html')
-
-    # If SMTP is not configured, or sending fails, write the email to disk
-    # so developers can inspect it. Return True if email was sent, False otherwise.
-    if not SMTP_HOST or not SMTP_USER or not SMTP_PASS:
-        # Save to disk
-        print(f"WARNING: SMTP not fully configured. SMTP_HOST={SMTP_HOST}, SMTP_USER={SMTP_USER}")
-        try:
-            os.makedirs('outgoing_emails', exist_ok=True)
-            fname = os.path.join('outgoing_emails', f"email_{course_id}_{int(time.time())}.html")
-            with open(fname, 'w', encoding='utf-8') as f:
-                f.write(f"To: {to_email}\nSubject: {subject}\n\n{html_body}")
-            print(f"Email saved to {fname} (SMTP not configured)")
-        except Exception as e:
-            print("Failed to save email to disk:", e)
-        return False
+""")
 
-    try:
-        print(f"Attempting to send email to {to_email} via SMTP_HOST={SMTP_HOST}")
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as smtp:
-            # If credentials provided, try secure connection and login
-            if SMTP_USER:
-                try:
-                    smtp.starttls()
-                    print("STARTTLS successful")
-                except Exception as e:
-                    # starttls may not be supported; continue anyway
-                    print(f"STARTTLS warning (continuing): {e}")
-                try:
-                    smtp.login(SMTP_USER, SMTP_PASS)
-                    print("SMTP login successful")
-                except Exception as e:
-                    print(f"SMTP login failed: {e}")
-                    raise
-            # send message
-            smtp.send_message(msg)
-        print(f"✓ Email sent successfully to {to_email}")
-        return True
-    except Exception as e:
-        print(f"EMAIL ERROR: failed to send via SMTP: {e}")
-        import traceback
-        traceback.print_exc()
-        # fallback: save to disk
-        try:
-            os.makedirs('outgoing_emails', exist_ok=True)
-            fname = os.path.join('outgoing_emails', f"email_{course_id}_{int(time.time())}.html")
-            with open(fname, 'w', encoding='utf-8') as f:
-                f.write(f"To: {to_email}\nSubject: {subject}\n\n{html_body}")
-            print(f"Email saved to {fname} (SMTP error)")
-        except Exception as e2:
-            print("Failed to save email to disk after SMTP error:", e2)
-        return False
-
-# ---------------------------
-# Owner Notification Email Function
-# ---------------------------
-def send_owner_notification(user_name: str, user_email: str, user_phone: str, course_name: str, course_id: int):
-    """Send booking notification to owner email"""
-    
-    schedule = COURSE_SCHEDULE.get(course_id, {})
-    start = schedule.get("start", "TBA")
-    end = schedule.get("end", "TBA")
-    date = schedule.get("date", "TBA")
-    
-    subject = f"New Booking: {user_name} registered for {course_name}"
-    
-    # HTML email template for owner
-    html_body = f"""
+OWNER_HTML = string.Template("""
     <html>
       <head>
-        <style>
-          body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-          .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; border-radius: 8px; }}
-          .header {{ background-color: #2196F3; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-          .content {{ background-color: white; padding: 20px; }}
-          .booking-details {{ background-color: #f0f0f0; padding: 15px; border-left: 4px solid #2196F3; margin: 15px 0; }}
-          .detail-item {{ margin: 10px 0; }}
-          .detail-label {{ font-weight: bold; color: #2196F3; }}
-          .footer {{ text-align: center; padding: 20px; font-size: 12px; color: #666; }}
-        </style>
+        """ + OWNER_STYLE + """
       </head>
       <body>
         <div class="container">
@@ -347,22 +404,22 @@ def send_owner_notification(user_name: str, user_email: str, user_phone: str, co
             
             <div class="booking-details">
               <div class="detail-item">
-                <span class="detail-label">Student Name:</span> {user_name}
+                <span class="detail-label">Student Name:</span> ${user_name}
               </div>
               <div class="detail-item">
-                <span class="detail-label">Email:</span> {user_email}
+                <span class="detail-label">Email:</span> ${user_email}
               </div>
               <div class="detail-item">
-                <span class="detail-label">Phone:</span> {user_phone}
+                <span class="detail-label">Phone:</span> ${user_phone}
               </div>
               <div class="detail-item">
-                <span class="detail-label">Course:</span> {course_name}
+                <span class="detail-label">Course:</span> ${course_name}
               </div>
               <div class="detail-item">
-                <span class="detail-label">Date:</span> {date}
+                <span class="detail-label">Date:</span> ${date}
               </div>
               <div class="detail-item">
-                <span class="detail-label">Time:</span> {start} - {end}
+                <span class="detail-label">Time:</span> ${start} - ${end}
               </div>
             </div>
             
@@ -375,49 +432,139 @@ def send_owner_notification(user_name: str, user_email: str, user_phone: str, co
         </div>
       </body>
     </html>
-    """
-    
-    # Plain text fallback
-    text_body = f"""
+    """)
+
+OWNER_TEXT = string.Template("""
 New Course Booking Notification
 
-Student Name: {user_name}
-Email: {user_email}
-Phone: {user_phone}
-Course: {course_name}
-Date: {date}
-Time: {start} - {end}
+Student Name: ${user_name}
+Email: ${user_email}
+Phone: ${user_phone}
+Course: ${course_name}
+Date: ${date}
+Time: ${start} - ${end}
 
 — Course Booking System
-"""
+""")
 
+def build_message(to_email: str, subject: str, text_body: str, html_body: str) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = FROM_EMAIL
-    msg["To"] = OWNER_EMAIL
+    msg["To"] = to_email
     msg["Subject"] = subject
     msg.set_content(text_body)
     msg.add_alternative(html_body, subtype='html')
+    return msg
+
+# ---------------------------
+# Email Function
+# ---------------------------
+def save_email_to_disk(to_email: str, subject: str, html_body: str, course_id: int) -> str:
+    # Blocking file I/O; called via asyncio.to_thread to keep it off the event loop
+    os.makedirs('outgoing_emails', exist_ok=True)
+    fname = os.path.join('outgoing_emails', f"email_{course_id}_{int(time.time())}.html")
+    with open(fname, 'w', encoding='utf-8') as f:
+        f.write(f"To: {to_email}\nSubject: {subject}\n\n{html_body}")
+    return fname
+
+
+async def send_confirmation_email(to_email: str, user_name: str, course_name: str, course_id: int):
+
+    start, end, date = COURSE_SCHEDULE.get(course_id, SCHEDULE_TBA)
+
+    subject = f"Booking Confirmed — {course_name}"
+    
+    # HTML email template
+    html_body = CONFIRM_HTML.substitute(
+        user_name=user_name, course_name=course_name, date=date, start=start, end=end
+    )
+    
+    # Plain text fallback
+    text_body = CONFIRM_TEXT.substitute(
+        user_name=user_name, course_name=course_name, date=date, start=start, end=end
+    )
+
+    msg = build_message(to_email, subject, text_body, html_body)
+
+    # If SMTP is not configured, or sending fails, write the email to disk
+    # so developers can inspect it. Return True if email was sent, False otherwise.
+    if not SMTP_HOST or not SMTP_USER or not SMTP_PASS:
+        # Save to disk
+        logger.warning("SMTP not fully configured. SMTP_HOST=%s, SMTP_USER=%s", SMTP_HOST, SMTP_USER)
+        try:
+            fname = await asyncio.to_thread(save_email_to_disk, to_email, subject, html_body, course_id)
+            logger.info("Email saved to %s (SMTP not configured)", fname)
+        except Exception as e:
+            logger.error("Failed to save email to disk: %s", e)
+        return False
+
+    try:
+        logger.debug("Attempting to send email to %s via SMTP_HOST=%s", to_email, SMTP_HOST)
+        await SMTP_POOL.send(msg)
+        logger.info("✓ Email sent successfully to %s", to_email)
+        return True
+    except Exception as e:
+        logger.exception("EMAIL ERROR: failed to send via SMTP: %s", e)
+        # fallback: save to disk
+        try:
+            fname = await asyncio.to_thread(save_email_to_disk, to_email, subject, html_body, course_id)
+            logger.info("Email saved to %s (SMTP error)", fname)
+        except Exception as e2:
+            logger.error("Failed to save email to disk after SMTP error: %s", e2)
+        return False
+
+# ---------------------------
+# Owner Notification Email Function
+# ---------------------------
+async def send_owner_notification(user_name: str, user_email: str, user_phone: str, course_name: str, course_id: int):
+    """Send booking notification to owner email"""
+    
+    start, end, date = COURSE_SCHEDULE.get(course_id, SCHEDULE_TBA)
+    
+    subject = f"New Booking: {user_name} registered for {course_name}"
+    
+    # HTML email template for owner
+    html_body = OWNER_HTML.substitute(
+        user_name=user_name, user_email=user_email, user_phone=user_phone,
+        course_name=course_name, date=date, start=start, end=end,
+    )
+    
+    # Plain text fallback
+    text_body = OWNER_TEXT.substitute(
+        user_name=user_name, user_email=user_email, user_phone=user_phone,
+        course_name=course_name, date=date, start=start, end=end,
+    )
+
+    msg = build_message(OWNER_EMAIL, subject, text_body, html_body)
 
     # If SMTP is not configured, skip sending to owner
     if not SMTP_HOST or not OWNER_EMAIL:
-        print("Owner email not configured, skipping owner notification")
+        logger.info("Owner email not configured, skipping owner notification")
         return False
 
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as smtp:
-            if SMTP_USER:
-                try:
-                    smtp.starttls()
-                except Exception:
-                    pass
-                smtp.login(SMTP_USER, SMTP_PASS)
-            smtp.send_message(msg)
-        print(f"Owner notification sent to {OWNER_EMAIL}")
+        await SMTP_POOL.send(msg)
+        logger.info("Owner notification sent to %s", OWNER_EMAIL)
         return True
     except Exception as e:
-        print("OWNER EMAIL ERROR: failed to send notification to owner:", e)
+        logger.error("OWNER EMAIL ERROR: failed to send notification to owner: %s", e)
         return False
 
+# ---------------------------
+# Booking Emails
+# ---------------------------
+async def send_booking_emails(user_name: str, user_email: str, user_phone: str, course_name: str, course_id: int):
+    """Send the student confirmation and the owner notification back to back
+    over the shared SMTP connection. A failure in one doesn't stop the other."""
+    try:
+        await send_confirmation_email(user_email, user_name, course_name, course_id)
+    except Exception as e:
+        logger.exception("Failed to send confirmation email (unexpected): %s", e)
+    try:
+        await send_owner_notification(user_name, user_email, user_phone, course_name, course_id)
+    except Exception as e:
+        logger.exception("Failed to send owner notification (unexpected): %s", e)
+
 # ---------------------------
 # Pydantic Input Schema
 # ---------------------------
@@ -433,103 +580,96 @@ class BookingIn(BaseModel):
 # GET /courses
 # ---------------------------
 @app.get("/courses")
-def get_courses(db: Session = Depends(get_db)):
-    courses = db.query(models.Course).all()
+async def get_courses(db: AsyncSession = Depends(get_db)):
+    # Course details come from the cache; one grouped query gives the counts
+    counts = dict(
+        (
+            await db.execute(
+                select(models.Booking.course_id, func.count(models.Booking.id))
+                .group_by(models.Booking.course_id)
+            )
+        ).all()
+    )
+    if not COURSE_CACHE:
+        await load_course_cache(db)
     result = []
 
-    for c in courses:
-        booked_count = (
-            db.query(models.Booking)
-            .filter(models.Booking.course_id == c.id)
-            .count()
-        )
-
+    for course_id, (name, description, total_seats) in sorted(COURSE_CACHE.items()):
         result.append({
-            "id": c.id,
-            "name": c.name,
-            "description": c.description,
-            "total_seats": c.total_seats,
-            "booked_count": booked_count,
+            "id": course_id,
+            "name": name,
+            "description": description,
+            "total_seats": total_seats,
+            "booked_count": counts.get(course_id, 0),
         })
 
     return result
 
 
 @app.get("/courses/{course_id}/bookings")
-def get_course_bookings(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+async def get_course_bookings(course_id: int, db: AsyncSession = Depends(get_db)):
+    course = (
+        await db.execute(
+            select(models.Course)
+            .options(selectinload(models.Course.bookings))
+            .where(models.Course.id == course_id)
+        )
+    ).scalars().first()
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    bookings = db.query(models.Booking).filter(models.Booking.course_id == course_id).all()
-    return [{"id": b.id, "user_name": b.user_name, "email": b.email, "phone": b.phone} for b in bookings]
+    return [{"id": b.id, "user_name": b.user_name, "email": b.email, "phone": b.phone} for b in course.bookings]
 
 # ---------------------------
 # POST /book
 # ---------------------------
 @app.post("/book")
-def book_course(payload: BookingIn, db: Session = Depends(get_db)):
+async def book_course(payload: BookingIn, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     try:
-        course = db.query(models.Course).filter(
-            models.Course.id == payload.course_id
-        ).first()
-
-        if not course:
+        cached = await get_cached_course(db, payload.course_id)
+        if cached is None:
             raise HTTPException(status_code=404, detail="Course not found")
+        course_name = cached[0]
+
+        # Create booking only if a seat is still free. The seat check and the
+        # insert run as one statement so concurrent requests can't overbook.
+        result = await db.execute(
+            text(
+                "INSERT INTO bookings (user_name, course_id, email, phone) "
+                "SELECT :user_name, :course_id, :email, :phone "
+                "WHERE (SELECT COUNT(*) FROM bookings WHERE course_id = :course_id) "
+                "< (SELECT total_seats FROM courses WHERE id = :course_id)"
+            ),
+            {
+                "user_name": payload.user_name,
+                "course_id": payload.course_id,
+                "email": payload.email,
+                "phone": payload.phone,
+            },
+        )
 
-        booked_count = db.query(models.Booking).filter(
-            models.Booking.course_id == payload.course_id
-        ).count()
-
-        if booked_count >= course.total_seats:
+        if result.rowcount == 0:
+            await db.rollback()
             raise HTTPException(status_code=400, detail="Course is full")
 
-        # Create booking
-        booking = models.Booking(
-            user_name=payload.user_name,
-            course_id=payload.course_id,
-            email=payload.email,
-            phone=payload.phone,
+        await db.commit()
+
+        # Send emails after the response goes out so SMTP latency doesn't
+        # hold up the booking. send_booking_emails logs any email failure.
+        logger.debug("Queueing emails for course ID %s, course name: %s", payload.course_id, course_name)
+        background_tasks.add_task(
+            send_booking_emails,
+            payload.user_name,
+            payload.email,
+            payload.phone,
+            course_name,
+            payload.course_id,
         )
-        db.add(booking)
-        db.commit()
-
-        # Try to send email but do not fail booking if email sending fails.
-        try:
-            print(f"DEBUG: Sending email for course ID {course.id}, course name: {course.name}")
-            email_sent = send_confirmation_email(
-                payload.email,
-                payload.user_name,
-                course.name,
-                course.id,
-            )
-        except Exception as e:
-            # Shouldn't normally happen because send_confirmation_email catches errors,
-            # but defensively handle it here.
-            print("Failed to send confirmation email (unexpected):", e)
-            email_sent = False
-
-        # Send notification to owner
-        try:
-            send_owner_notification(
-                payload.user_name,
-                payload.email,
-                payload.phone,
-                course.name,
-                course.id,
-            )
-        except Exception as e:
-            print("Failed to send owner notification (unexpected):", e)
 
-        if email_sent:
-            return {"message": "Booking successful! Confirmation email sent."}
-        else:
-            return {"message": "Booking successful! But confirmation email could not be sent."}
+        return {"message": "Booking successful; confirmation email is on its way."}
     except HTTPException:
         raise
     except Exception as e:
-        print(f"ERROR in /book endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ERROR in /book endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
@@ -1,6 +1,13 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
+import os
+
+
+# Relationships never load implicitly when SQLALCHEMY_RAISELOAD=1 (dev/test),
+# so accidental per-row lazy loads (N+1) fail loudly. Load them explicitly
+# with selectinload() where they're needed.
+RELATIONSHIP_LAZY = "raise" if os.getenv("SQLALCHEMY_RAISELOAD") == "1" else "select"
 
 
 class Course(Base):
@@ -10,15 +17,15 @@ class Course(Base):
     description = Column(String, nullable=True)
     total_seats = Column(Integer, default=0)
     
-    bookings = relationship("Booking", back_populates="course")
+    bookings = relationship("Booking", back_populates="course", lazy=RELATIONSHIP_LAZY)
 
 
 class Booking(Base):
     __tablename__ = "bookings"
     id = Column(Integer, primary_key=True, index=True)
     user_name = Column(String)
-    course_id = Column(Integer, ForeignKey("courses.id"))
+    course_id = Column(Integer, ForeignKey("courses.id"), index=True)
     email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
     
-    course = relationship("Course", back_populates="bookings")
\ No newline at end of file
+    course = relationship("Course", back_populates="bookings", lazy=RELATIONSHIP_LAZY)
\ No newline at end of file